@@ -12,8 +12,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.repetition_code import RepetitionCode, UnprotectedQubit
-from src.error_simulation import run_error_correction_simulation, run_unprotected_simulation
-from src.decoder import calculate_logical_error_rate
+from src.error_simulation import simulate_and_decode, run_unprotected_simulation
 import numpy as np
 
 
@@ -43,14 +42,10 @@ def main():
     print(f"  Number of syndrome measurements: {code.num_ancillas}")
     print()
     
-    # Run protected simulation
+    # Run protected simulation (sampling and decoding fused)
     print("Running error correction simulation...")
-    protected_samples, circuit = run_error_correction_simulation(
-        code, noise_prob, num_shots=num_shots
-    )
-    
-    # Calculate logical error rate
-    logical_error_rate = calculate_logical_error_rate(protected_samples, code_distance)
+    logical_error_rate = simulate_and_decode(code, noise_prob, num_shots=num_shots)
+    circuit = code.create_full_circuit(noise_prob)
     print(f"  Logical error rate (protected): {logical_error_rate:.4f} ({logical_error_rate * 100:.2f}%)")
     print()
     
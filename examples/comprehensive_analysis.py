@@ -29,7 +29,7 @@ def analyze_measurement_error_impact():
     
     code_distance = 5
     noise_prob = 0.05  # Fixed physical error rate
-    measurement_errors = [0.0, 0.001, 0.005, 0.01, 0.02, 0.05]
+    measurement_errors = np.asarray([0.0, 0.001, 0.005, 0.01, 0.02, 0.05])
     num_shots = 10000
     
     print(f"Configuration:")
@@ -40,13 +40,25 @@ def analyze_measurement_error_impact():
     
     code = RepetitionCode(code_distance)
     logical_error_rates = []
-    
+
+    # Measurement errors are classical bit flips on the recorded outcomes,
+    # so simulate once without them and inject each error rate post-hoc by
+    # XOR-ing a fresh Bernoulli mask — identical statistics, one Stim run
+    # instead of one per sweep point. The circuit model applies its
+    # X_ERROR only to the ancilla measurements, so the mask covers only
+    # the syndrome columns; the final data records stay clean.
+    rng = np.random.default_rng()
+    samples, _ = run_error_correction_simulation(
+        code, noise_prob, measurement_noise=0.0, num_shots=num_shots
+    )
+    samples = samples.astype(np.uint8)
+
     for meas_error in measurement_errors:
         print(f"Testing measurement error = {meas_error * 100}%...")
-        samples, _ = run_error_correction_simulation(
-            code, noise_prob, measurement_noise=meas_error, num_shots=num_shots
-        )
-        logical_error_rate = calculate_logical_error_rate(samples, code_distance)
+        noisy_samples = samples.copy()
+        flips = (rng.random((num_shots, code.num_ancillas)) < meas_error)
+        noisy_samples[:, :code.num_ancillas] ^= flips.astype(np.uint8)
+        logical_error_rate = calculate_logical_error_rate(noisy_samples, code_distance)
         logical_error_rates.append(logical_error_rate)
         print(f"  Logical error rate: {logical_error_rate:.4f}")
     
@@ -115,8 +127,10 @@ def main():
         unprotected = results[f'd{distance}_unprotected']
         
         # Find the noise level where protection is most effective
-        improvements = [(u - p) / u * 100 for u, p in zip(unprotected, protected)]
-        best_idx = np.argmax(improvements)
+        improvements = np.divide(unprotected - protected, unprotected,
+                                 out=np.zeros_like(unprotected),
+                                 where=unprotected != 0) * 100
+        best_idx = int(np.argmax(improvements))
         best_noise = noise_probs[best_idx]
         best_improvement = improvements[best_idx]
         
@@ -14,8 +14,7 @@ import numpy as np
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.repetition_code import RepetitionCode
-from src.error_simulation import run_error_correction_simulation, run_unprotected_simulation
-from src.decoder import calculate_logical_error_rate
+from src.error_simulation import simulate_and_decode, run_unprotected_simulation
 from src.analysis import PerformanceAnalyzer
 
 def main():
@@ -35,9 +34,8 @@ def main():
     for p in noise_probs:
         print(f"  Simulating p={p}...")
         
-        # Protected
-        samples, _ = run_error_correction_simulation(code, p, num_shots=num_shots)
-        p_rate = calculate_logical_error_rate(samples, code_distance)
+        # Protected (sampling and decoding fused)
+        p_rate = simulate_and_decode(code, p, num_shots=num_shots)
         protected_rates.append(p_rate)
         
         # Unprotected
@@ -12,8 +12,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.repetition_code import RepetitionCode
-from src.error_simulation import run_error_correction_simulation, run_unprotected_simulation
-from src.decoder import calculate_logical_error_rate
+from src.error_simulation import simulate_and_decode, run_unprotected_simulation
 import numpy as np
 
 
@@ -44,15 +43,10 @@ def main():
     print(f"  Number of physical qubits: {code.num_qubits}")
     print()
     
-    # Run protected simulation
-    print("Running phase-flip error correction simulation...")
-    protected_samples, circuit = run_error_correction_simulation(
-        code, noise_prob, num_shots=num_shots
-    )
-    
-    # Calculate logical error rate
+    # Run protected simulation (sampling and decoding fused)
     # Note: Majority vote works the same way because we map |+> to 0 and |-> to 1
-    logical_error_rate = calculate_logical_error_rate(protected_samples, code_distance)
+    print("Running phase-flip error correction simulation...")
+    logical_error_rate = simulate_and_decode(code, noise_prob, num_shots=num_shots)
     print(f"  Logical error rate (protected): {logical_error_rate:.4f} ({logical_error_rate * 100:.2f}%)")
     print()
     
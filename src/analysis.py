@@ -6,9 +6,27 @@ and generating visualizations.
 """
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # headless backend; all plots here go straight to PNG
 import matplotlib.pyplot as plt
 from typing import List, Dict, Tuple
+import concurrent.futures
+import functools
+import multiprocessing
 import os
+import pathlib
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_repetition_code(distance, basis='z'):
+    """
+    Return a shared RepetitionCode for (distance, basis).
+
+    The code object is stateless once built, so repeated analyses (and
+    interactive sessions) can reuse one instance per configuration.
+    """
+    from .repetition_code import RepetitionCode
+    return RepetitionCode(distance, basis=basis)
 
 
 class PerformanceAnalyzer:
@@ -23,46 +41,55 @@ class PerformanceAnalyzer:
         Args:
             output_dir (str): Directory to save plots and results
         """
-        self.output_dir = output_dir
-        os.makedirs(output_dir, exist_ok=True)
-    
-    def compare_protected_vs_unprotected(self, noise_probs, protected_rates, 
+        self.output_dir = pathlib.Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        # One reused figure/axes pair for all plots; each plot method
+        # clears the axes instead of paying pyplot's per-figure setup.
+        self._fig, self._ax = plt.subplots(figsize=(10, 6))
+
+    def _save(self, filename):
+        """Lay out and save the shared figure, then report the path."""
+        self._fig.tight_layout()
+        self._fig.savefig(filename, dpi=150)
+
+    def compare_protected_vs_unprotected(self, noise_probs, protected_rates,
                                         unprotected_rates, code_distance):
         """
         Create a comparison plot of protected vs unprotected error rates.
-        
+
         Args:
             noise_probs (list): List of noise probabilities
             protected_rates (list): Logical error rates for protected qubits
             unprotected_rates (list): Error rates for unprotected qubits
             code_distance (int): Code distance used
         """
-        plt.figure(figsize=(10, 6))
-        
-        plt.plot(noise_probs, unprotected_rates, 'o-', label='Unprotected Qubit', 
-                linewidth=2, markersize=8, color='red')
-        plt.plot(noise_probs, protected_rates, 's-', 
-                label=f'Protected ({code_distance}-qubit code)', 
-                linewidth=2, markersize=8, color='blue')
-        
-        plt.xlabel('Physical Error Rate (Bit-Flip Probability)', fontsize=12)
-        plt.ylabel('Logical Error Rate', fontsize=12)
-        plt.title(f'Error Correction Performance: {code_distance}-Qubit Repetition Code', 
-                 fontsize=14, fontweight='bold')
-        plt.legend(fontsize=11)
-        plt.grid(True, alpha=0.3)
-        plt.yscale('log')
-        plt.xscale('log')
-        
+        ax = self._ax
+        ax.clear()
+        self._fig.set_size_inches(10, 6)
+
+        ax.plot(noise_probs, unprotected_rates, 'o-', label='Unprotected Qubit',
+                linewidth=2, markersize=8, color='red', rasterized=True)
+        ax.plot(noise_probs, protected_rates, 's-',
+                label=f'Protected ({code_distance}-qubit code)',
+                linewidth=2, markersize=8, color='blue', rasterized=True)
+
+        ax.set_xlabel('Physical Error Rate (Bit-Flip Probability)', fontsize=12)
+        ax.set_ylabel('Logical Error Rate', fontsize=12)
+        ax.set_title(f'Error Correction Performance: {code_distance}-Qubit Repetition Code',
+                     fontsize=14, fontweight='bold')
+        ax.legend(fontsize=11)
+        ax.grid(True, alpha=0.3)
+        ax.set_yscale('log')
+        ax.set_xscale('log')
+
         # Add threshold line
-        plt.axhline(y=0.5, color='gray', linestyle='--', alpha=0.5, 
+        ax.axhline(y=0.5, color='gray', linestyle='--', alpha=0.5,
                    label='Random guess (50%)')
-        
-        filename = os.path.join(self.output_dir, 
-                               f'protected_vs_unprotected_d{code_distance}.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        
+
+        filename = self.output_dir / f'protected_vs_unprotected_d{code_distance}.png'
+        self._save(filename)
+
         print(f"Saved comparison plot: {filename}")
     
     def compare_code_sizes(self, noise_probs, error_rates_by_distance, 
@@ -75,38 +102,39 @@ class PerformanceAnalyzer:
             error_rates_by_distance (dict): Dict mapping code_distance to error rates
             unprotected_rates (list, optional): Unprotected error rates for reference
         """
-        plt.figure(figsize=(12, 7))
-        
+        ax = self._ax
+        ax.clear()
+        self._fig.set_size_inches(12, 7)
+
         colors = ['blue', 'green', 'purple', 'orange']
         markers = ['s', 'o', '^', 'd']
-        
+
         # Plot protected codes
         for idx, (distance, rates) in enumerate(sorted(error_rates_by_distance.items())):
-            plt.plot(noise_probs, rates, 
+            ax.plot(noise_probs, rates,
                     marker=markers[idx % len(markers)],
                     label=f'{distance}-qubit code',
                     linewidth=2, markersize=8,
-                    color=colors[idx % len(colors)])
-        
+                    color=colors[idx % len(colors)], rasterized=True)
+
         # Plot unprotected if provided
         if unprotected_rates is not None:
-            plt.plot(noise_probs, unprotected_rates, 'o-', 
-                    label='Unprotected', linewidth=2, markersize=8, 
-                    color='red', alpha=0.7)
-        
-        plt.xlabel('Physical Error Rate (Bit-Flip Probability)', fontsize=12)
-        plt.ylabel('Logical Error Rate', fontsize=12)
-        plt.title('Code Size Comparison: Repetition Codes', 
-                 fontsize=14, fontweight='bold')
-        plt.legend(fontsize=11)
-        plt.grid(True, alpha=0.3)
-        plt.yscale('log')
-        plt.xscale('log')
-        
-        filename = os.path.join(self.output_dir, 'code_size_comparison.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        
+            ax.plot(noise_probs, unprotected_rates, 'o-',
+                    label='Unprotected', linewidth=2, markersize=8,
+                    color='red', alpha=0.7, rasterized=True)
+
+        ax.set_xlabel('Physical Error Rate (Bit-Flip Probability)', fontsize=12)
+        ax.set_ylabel('Logical Error Rate', fontsize=12)
+        ax.set_title('Code Size Comparison: Repetition Codes',
+                     fontsize=14, fontweight='bold')
+        ax.legend(fontsize=11)
+        ax.grid(True, alpha=0.3)
+        ax.set_yscale('log')
+        ax.set_xscale('log')
+
+        filename = self.output_dir / 'code_size_comparison.png'
+        self._save(filename)
+
         print(f"Saved code size comparison: {filename}")
     
     def plot_measurement_error_impact(self, noise_prob, measurement_errors, 
@@ -120,22 +148,22 @@ class PerformanceAnalyzer:
             logical_error_rates (list): Corresponding logical error rates
             code_distance (int): Code distance used
         """
-        plt.figure(figsize=(10, 6))
-        
-        plt.plot(measurement_errors, logical_error_rates, 'o-', 
-                linewidth=2, markersize=8, color='purple')
-        
-        plt.xlabel('Measurement Error Probability', fontsize=12)
-        plt.ylabel('Logical Error Rate', fontsize=12)
-        plt.title(f'Impact of Measurement Errors ({code_distance}-qubit code, ' + 
-                 f'p_phys = {noise_prob})', fontsize=14, fontweight='bold')
-        plt.grid(True, alpha=0.3)
-        
-        filename = os.path.join(self.output_dir, 
-                               f'measurement_error_impact_d{code_distance}.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        
+        ax = self._ax
+        ax.clear()
+        self._fig.set_size_inches(10, 6)
+
+        ax.plot(measurement_errors, logical_error_rates, 'o-',
+                linewidth=2, markersize=8, color='purple', rasterized=True)
+
+        ax.set_xlabel('Measurement Error Probability', fontsize=12)
+        ax.set_ylabel('Logical Error Rate', fontsize=12)
+        ax.set_title(f'Impact of Measurement Errors ({code_distance}-qubit code, ' +
+                     f'p_phys = {noise_prob})', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+
+        filename = self.output_dir / f'measurement_error_impact_d{code_distance}.png'
+        self._save(filename)
+
         print(f"Saved measurement error impact plot: {filename}")
     
     def generate_summary_report(self, results_dict, filename='summary_report.txt'):
@@ -146,7 +174,7 @@ class PerformanceAnalyzer:
             results_dict (dict): Dictionary containing analysis results
             filename (str): Output filename
         """
-        filepath = os.path.join(self.output_dir, filename)
+        filepath = self.output_dir / filename
         
         with open(filepath, 'w') as f:
             f.write("=" * 70 + "\n")
@@ -188,30 +216,68 @@ def calculate_error_rates_from_samples(samples_list, code_distances, expected_va
     return error_rates
 
 
-def run_comprehensive_analysis(code_distances=[3, 5, 7], 
+def _run_point(args):
+    """
+    Simulate one (distance, noise_prob) grid point.
+
+    Defined at module level so it can be submitted to a process pool from
+    run_comprehensive_analysis.
+
+    Args:
+        args: Tuple of (distance, noise_prob, num_shots, rng)
+
+    Returns:
+        Tuple[int, float, float, float]: (distance, noise_prob,
+        logical_error_rate, physical_error_rate)
+    """
+    distance, noise_prob, num_shots, rng = args
+
+    from .error_simulation import (simulate_and_decode,
+                                   run_unprotected_simulation)
+
+    # Protected qubit
+    code = _cached_repetition_code(distance)
+    logical_error_rate = simulate_and_decode(code, noise_prob,
+                                             num_shots=num_shots)
+
+    # Unprotected qubit
+    unprotected_samples, _ = run_unprotected_simulation(noise_prob,
+                                                        num_shots=num_shots,
+                                                        rng=rng)
+    physical_error_rate = float(np.mean(unprotected_samples))
+
+    return distance, noise_prob, logical_error_rate, physical_error_rate
+
+
+def run_comprehensive_analysis(code_distances=[3, 5, 7],
                                noise_probs=None,
                                num_shots=10000,
-                               output_dir='results'):
+                               output_dir='results',
+                               rng=None):
     """
     Run a comprehensive analysis of quantum error correction performance.
-    
+
     Args:
         code_distances (list): List of code distances to test
         noise_probs (list): List of noise probabilities to sweep
         num_shots (int): Number of shots per simulation
         output_dir (str): Directory for output files
-        
+        rng (numpy.random.Generator, optional): Generator for the
+            unprotected-baseline draws; pass a seeded generator for
+            reproducible baselines
+
     Returns:
         dict: Complete analysis results
     """
-    from .repetition_code import RepetitionCode
-    from .error_simulation import (run_error_correction_simulation, 
-                                   run_unprotected_simulation)
-    from .decoder import calculate_logical_error_rate
-    
+    if rng is None:
+        rng = np.random.default_rng()
     if noise_probs is None:
         noise_probs = [0.001, 0.005, 0.01, 0.02, 0.05, 0.1, 0.15, 0.2]
-    
+
+    # Convert once; everything downstream (plotting, reporting) then works
+    # on the same float64 array instead of re-converting the list.
+    noise_probs = np.asarray(noise_probs, dtype=np.float64)
+
     analyzer = PerformanceAnalyzer(output_dir)
     results = {}
     
@@ -220,36 +286,49 @@ def run_comprehensive_analysis(code_distances=[3, 5, 7],
     print(f"Noise probabilities: {noise_probs}")
     print(f"Shots per simulation: {num_shots}\n")
     
+    # Every (distance, noise_prob) point is independent, so run the grid
+    # on a process pool and collect the rates as points complete. Each
+    # worker gets an independent child generator spawned from rng.
+    grid = [(distance, noise_prob)
+            for distance in code_distances
+            for noise_prob in noise_probs]
+    child_rngs = rng.spawn(len(grid))
+    tasks = [(distance, noise_prob, num_shots, child_rng)
+             for (distance, noise_prob), child_rng in zip(grid, child_rngs)]
+
+    # Spawn fresh workers rather than forking: forking is unsafe once
+    # any importer has touched Numba's parallel runtime (the decoder
+    # kernels do on first use), and a forked pool then hangs at exit.
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context('spawn')) as executor:
+        point_results = list(executor.map(_run_point, tasks))
+
+    rates_by_point = {(distance, noise_prob): (logical, physical)
+                      for distance, noise_prob, logical, physical in point_results}
+
     # Compare each code size against unprotected
     for distance in code_distances:
         print(f"\nAnalyzing {distance}-qubit repetition code...")
-        code = RepetitionCode(distance)
-        
+
         protected_rates = []
         unprotected_rates = []
-        
+
         for noise_prob in noise_probs:
-            # Protected qubit
-            samples, _ = run_error_correction_simulation(code, noise_prob, 
-                                                         num_shots=num_shots)
-            logical_error_rate = calculate_logical_error_rate(samples, distance)
+            logical_error_rate, physical_error_rate = rates_by_point[(distance, noise_prob)]
             protected_rates.append(logical_error_rate)
-            
-            # Unprotected qubit
-            unprotected_samples, _ = run_unprotected_simulation(noise_prob, 
-                                                                num_shots=num_shots)
-            physical_error_rate = np.mean(unprotected_samples)
             unprotected_rates.append(physical_error_rate)
-            
-            print(f"  p={noise_prob:.3f}: Protected={logical_error_rate:.4f}, " + 
+
+            print(f"  p={noise_prob:.3f}: Protected={logical_error_rate:.4f}, " +
                   f"Unprotected={physical_error_rate:.4f}")
-        
+
         # Save individual comparison
         analyzer.compare_protected_vs_unprotected(noise_probs, protected_rates,
                                                   unprotected_rates, distance)
-        
-        results[f'd{distance}_protected'] = protected_rates
-        results[f'd{distance}_unprotected'] = unprotected_rates
+
+        # Store as arrays so downstream reporting can do vectorized math
+        results[f'd{distance}_protected'] = np.asarray(protected_rates)
+        results[f'd{distance}_unprotected'] = np.asarray(unprotected_rates)
     
     # Compare all code sizes
     print("\nGenerating code size comparison...")
@@ -8,6 +8,72 @@ The decoder interprets syndrome measurements and corrects errors.
 import numpy as np
 from typing import List
 
+# NumPy >= 2.0 exposes a vectorized popcount (np.bitwise_count). When it is
+# available we bit-pack each shot's data bits and take Hamming weights with a
+# single SIMD-backed call instead of summing one byte per bit.
+_HAS_BITWISE_COUNT = hasattr(np, 'bitwise_count')
+
+# Numba is an optional dependency. When present, the logical error count is
+# computed by a compiled kernel that parallelizes over shots and never
+# materializes the intermediate decoded array.
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+# PyMatching is an optional dependency used by decode_with_pymatching to
+# run minimum-weight perfect matching over a circuit's detector error model.
+try:
+    import pymatching
+    _HAS_PYMATCHING = True
+except ImportError:
+    _HAS_PYMATCHING = False
+
+
+def _popcount_rows(packed):
+    """
+    Hamming weight of each row of packed bytes, branch-free.
+
+    Rows of at most 8 bytes are widened to a single uint64 per shot so
+    the whole weight is one vectorized popcount; wider rows fall back to
+    summing per-byte popcounts. Requires NumPy >= 2.0 (np.bitwise_count).
+    """
+    num_bytes = packed.shape[1]
+    if num_bytes <= 8:
+        if num_bytes < 8:
+            padded = np.zeros((packed.shape[0], 8), dtype=np.uint8)
+            padded[:, :num_bytes] = packed
+            packed = padded
+        return np.bitwise_count(packed.view(np.uint64).ravel())
+    return np.bitwise_count(packed).sum(axis=1, dtype=np.uint16)
+
+
+# Majority vote over d bits depends only on the packed bit pattern, so for
+# the small distances actually used the whole decode is one table lookup.
+# Each table has 2^d entries and fits comfortably in L1 cache.
+_MAJORITY_LUT = {
+    d: np.array([bin(i).count('1') * 2 > d for i in range(1 << d)],
+                dtype=np.uint8)
+    for d in (3, 5, 7, 9, 11)
+}
+
+
+if _HAS_NUMBA:
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def _logical_error_count(samples, num_syndrome, expected):
+        """Count shots whose majority vote disagrees with `expected`."""
+        num_shots, num_measurements = samples.shape
+        num_data = num_measurements - num_syndrome
+        errors = 0
+        for i in prange(num_shots):
+            ones = 0
+            for j in range(num_syndrome, num_measurements):
+                ones += samples[i, j]
+            decoded = 1 if 2 * ones > num_data else 0
+            errors += decoded != expected
+        return errors
+
 
 class MajorityVoteDecoder:
     """
@@ -39,11 +105,7 @@ class MajorityVoteDecoder:
             int: Decoded logical value (0 or 1)
         """
         # Simple majority vote on data measurements
-        ones_count = np.sum(data_measurements)
-        zeros_count = len(data_measurements) - ones_count
-        
-        # Return the majority value
-        return 1 if ones_count > zeros_count else 0
+        return int(2 * data_measurements.sum() > len(data_measurements))
     
     def decode_with_syndrome(self, syndrome, data_measurements):
         """
@@ -61,17 +123,63 @@ class MajorityVoteDecoder:
         """
         # For repetition codes, syndrome tells us where bit flips occurred
         # syndrome[i] = 1 means qubits i and i+1 differ
-        
-        # Start with the data measurements
-        corrected_data = data_measurements.copy()
-        
+
         # Use syndrome to identify error patterns
         # For simplicity, we'll use majority voting
         # More sophisticated decoders could use the syndrome more effectively
-        
+
         return self.decode(syndrome, data_measurements)
 
 
+if _HAS_NUMBA:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _decode_majority_kernel(data):
+        """Majority vote per shot over a (num_shots, num_data) array."""
+        num_shots, num_data = data.shape
+        out = np.empty(num_shots, dtype=np.uint8)
+        for i in prange(num_shots):
+            ones = 0
+            for j in range(num_data):
+                ones += data[i, j]
+            out[i] = 1 if 2 * ones > num_data else 0
+        return out
+
+    # Deliberately not warmed at import: running a parallel=True kernel
+    # starts Numba's threading layer, which is fork-unsafe — a process
+    # that imports this module and later forks (e.g. a process pool)
+    # hangs at interpreter shutdown. The first real decode pays the
+    # compile instead, amortized by cache=True across runs.
+
+
+def decode_repetition_majority(syndrome, data):
+    """
+    Batched majority-vote decoder for repetition codes.
+
+    Matches the batched decoder contract used by
+    ErrorSimulator.calculate_logical_error_rate: both arguments are
+    (num_shots, n) arrays and the result is one logical value per shot.
+    The syndrome is not consulted; majority vote on the data bits already
+    corrects every error pattern this code can correct.
+
+    Args:
+        syndrome (numpy.ndarray): Syndrome measurements (num_shots, d-1)
+        data (numpy.ndarray): Data qubit measurements (num_shots, d)
+
+    Returns:
+        numpy.ndarray: Decoded logical values (num_shots,), dtype uint8
+    """
+    # Normalize to contiguous C-order uint8 here at the Python boundary:
+    # the njit kernel then sees a single concrete layout and compiles to
+    # a tight unit-stride loop instead of generic strided access. The
+    # syndrome is not converted because the kernel never reads it.
+    data = np.ascontiguousarray(data, dtype=np.uint8)
+
+    if _HAS_NUMBA:
+        return _decode_majority_kernel(data)
+
+    return (data.sum(axis=1, dtype=np.uint16) * 2 > data.shape[1]).astype(np.uint8)
+
+
 def create_decoder(code_distance):
     """
     Factory function to create a decoder for a given code distance.
@@ -96,18 +204,32 @@ def decode_samples(samples, code_distance):
     Returns:
         numpy.ndarray: Array of decoded logical values
     """
-    decoder = create_decoder(code_distance)
     num_syndrome = code_distance - 1
-    
-    decoded_values = []
-    
-    for sample in samples:
-        syndrome = sample[:num_syndrome]
-        data = sample[num_syndrome:]
-        decoded_value = decoder.decode(syndrome, data)
-        decoded_values.append(decoded_value)
-    
-    return np.array(decoded_values)
+
+    # Keep samples as one byte per bit; generic arithmetic on Stim's bool
+    # output would otherwise promote to int64 and inflate memory traffic 8x.
+    samples = np.ascontiguousarray(samples, dtype=np.uint8)
+
+    # Majority vote on the data qubit columns, vectorized across all shots.
+    # A shot decodes to 1 when more than half of its data bits are 1.
+    data = samples[:, num_syndrome:]
+
+    lut = _MAJORITY_LUT.get(code_distance)
+    if lut is not None:
+        # Pack each shot's data bits into an integer and gather from the
+        # precomputed majority table.
+        packed = np.packbits(data, axis=1, bitorder='little')
+        byte_weights = np.left_shift(1, 8 * np.arange(packed.shape[1]))
+        return lut[packed @ byte_weights]
+
+    if _HAS_BITWISE_COUNT:
+        # Pack the data bits (8 per byte) and popcount the packed rows.
+        packed = np.packbits(data, axis=1)
+        votes = _popcount_rows(packed)
+    else:
+        votes = data.sum(axis=1, dtype=np.uint16)
+
+    return (votes * 2 > data.shape[1]).astype(np.uint8)
 
 
 def calculate_logical_error_rate(samples, code_distance, expected_value=0):
@@ -122,9 +244,48 @@ def calculate_logical_error_rate(samples, code_distance, expected_value=0):
     Returns:
         float: Logical error rate
     """
+    if _HAS_NUMBA:
+        samples = np.ascontiguousarray(samples, dtype=np.uint8)
+        errors = _logical_error_count(samples, code_distance - 1, expected_value)
+        return errors / len(samples)
+
     decoded_values = decode_samples(samples, code_distance)
-    errors = np.sum(decoded_values != expected_value)
-    return errors / len(decoded_values)
+    errors = np.count_nonzero(decoded_values != expected_value)
+    return errors / decoded_values.size
+
+
+def decode_with_pymatching(circuit, num_shots):
+    """
+    Sample and decode a circuit in one batched C++ pipeline.
+
+    Requires the circuit to carry DETECTOR / OBSERVABLE_INCLUDE
+    annotations (as emitted by create_syndrome_measurement_circuit).
+    Detector samples and observable flips are drawn already separated,
+    a pymatching.Matching is built from the circuit's detector error
+    model, and all shots are decoded with one decode_batch call — no
+    per-shot Python dispatch anywhere in the loop.
+
+    Args:
+        circuit (stim.Circuit): Annotated circuit to sample and decode
+        num_shots (int): Number of shots to sample
+
+    Returns:
+        numpy.ndarray: Per-shot logical error flags, shape (num_shots,);
+            the logical error rate is their mean
+    """
+    if not _HAS_PYMATCHING:
+        raise ImportError("decode_with_pymatching requires the optional "
+                          "'pymatching' package")
+
+    dem = circuit.detector_error_model(decompose_errors=True)
+    matching = pymatching.Matching.from_detector_error_model(dem)
+
+    sampler = circuit.compile_detector_sampler()
+    detections, observables = sampler.sample(num_shots,
+                                             separate_observables=True)
+
+    predictions = matching.decode_batch(detections)
+    return (predictions != observables).any(axis=1)
 
 
 def analyze_syndrome_patterns(samples, code_distance):
@@ -139,12 +300,23 @@ def analyze_syndrome_patterns(samples, code_distance):
         dict: Statistics about syndrome patterns
     """
     num_syndrome = code_distance - 1
-    syndrome_counts = {}
-    
-    for sample in samples:
-        syndrome = tuple(sample[:num_syndrome])
-        syndrome_counts[syndrome] = syndrome_counts.get(syndrome, 0) + 1
-    
+
+    # Pack each syndrome into a single integer code, then count the distinct
+    # codes with one C-level sort instead of a per-shot Python loop.
+    samples = np.ascontiguousarray(samples, dtype=np.uint8)
+    syndromes = samples[:, :num_syndrome]
+    packed = np.packbits(syndromes, axis=1, bitorder='little')
+    byte_weights = np.left_shift(1, 8 * np.arange(packed.shape[1]))
+    codes = packed @ byte_weights
+
+    unique_codes, counts = np.unique(codes, return_counts=True)
+
+    # Report syndromes as bit tuples, matching the measurement order
+    syndrome_counts = {
+        tuple((code >> bit) & 1 for bit in range(num_syndrome)): int(count)
+        for code, count in zip(unique_codes.tolist(), counts.tolist())
+    }
+
     # Calculate statistics
     total_samples = len(samples)
     syndrome_stats = {
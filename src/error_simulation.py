@@ -8,6 +8,8 @@ It provides tools to simulate bit-flip errors and measurement errors.
 import stim
 import numpy as np
 from typing import Tuple, List
+import concurrent.futures
+import os
 
 
 class ErrorSimulator:
@@ -15,136 +17,513 @@ class ErrorSimulator:
     Simulates quantum errors and runs circuit simulations.
     """
     
-    def __init__(self, num_shots=10000):
+    # Bound on cached samplers per simulator instance
+    _SAMPLER_CACHE_SIZE = 32
+
+    def __init__(self, num_shots=10000, skip_reference_sample=True):
         """
         Initialize the error simulator.
-        
+
         Args:
             num_shots (int): Number of simulation runs for statistical analysis
+            skip_reference_sample (bool): Skip computing the noiseless
+                reference sample when compiling samplers, so sampled bits
+                are flips relative to the all-zero reference. This is the
+                most expensive part of sampler setup and is valid for
+                every circuit in this package: the codes always encode
+                |0⟩, so the noiseless reference is identically zero and
+                flip bits equal measurement bits. Pass False for external
+                circuits without that guarantee.
         """
         self.num_shots = num_shots
-    
-    def simulate_circuit(self, circuit):
+        self.skip_reference_sample = skip_reference_sample
+
+        # Compiled samplers keyed by circuit identity and sampler kind
+        # ('m' for measurement, 'd' for detector). The circuit is stored
+        # alongside the sampler so its id cannot be recycled while the
+        # entry is alive; oldest entries are evicted beyond the bound.
+        self._sampler_cache = {}
+
+    def _get_sampler(self, circuit, kind='m'):
+        """Return a compiled sampler for the circuit, reusing cached ones."""
+        key = (kind, id(circuit))
+        cached = self._sampler_cache.get(key)
+
+        if cached is None or cached[0] is not circuit:
+            if kind == 'd':
+                sampler = circuit.compile_detector_sampler()
+            else:
+                sampler = circuit.compile_sampler(
+                    skip_reference_sample=self.skip_reference_sample
+                )
+            if len(self._sampler_cache) >= self._SAMPLER_CACHE_SIZE:
+                self._sampler_cache.pop(next(iter(self._sampler_cache)))
+            cached = (circuit, sampler)
+            self._sampler_cache[key] = cached
+
+        return cached[1]
+
+    def simulate_circuit(self, circuit, bit_packed=False, layout='aos', out=None):
         """
         Simulate a quantum circuit and collect measurement results.
-        
+
+        Repeated calls with the same circuit object reuse the compiled
+        sampler, so only the first call pays the compilation cost.
+
         Args:
             circuit (stim.Circuit): The circuit to simulate
-            
+            bit_packed (bool): Return samples packed 8 measurements per
+                byte (measurement k in bit k % 8 of byte k // 8), using
+                1/8 the memory of the default one-byte-per-bit layout
+            layout (str): 'aos' for the default (num_shots,
+                num_measurements) orientation, 'soa' for a contiguous
+                transposed copy (num_measurements, num_shots) so that
+                per-measurement reductions run at unit stride. The
+                transpose allocates, so it only pays off when samples are
+                reduced column-wise more than once.
+            out (numpy.ndarray, optional): Preallocated buffer of the
+                result's shape and dtype to copy the samples into, so a
+                serial sweep can reuse one hot buffer instead of a fresh
+                allocation per point. The caller must fully consume the
+                returned samples before the next simulate_circuit call
+                overwrites the buffer; concurrent callers need one
+                buffer each.
+
         Returns:
-            numpy.ndarray: Measurement results (num_shots x num_measurements)
+            numpy.ndarray: Measurement results in the requested layout
+            (the out buffer itself when one is given)
         """
-        sampler = circuit.compile_sampler()
-        samples = sampler.sample(shots=self.num_shots)
+        if layout not in ['aos', 'soa']:
+            raise ValueError("Layout must be 'aos' or 'soa'")
+        if bit_packed and layout == 'soa':
+            raise ValueError("Bit-packed samples only support the 'aos' layout")
+
+        sampler = self._get_sampler(circuit)
+        samples = sampler.sample(shots=self.num_shots, bit_packed=bit_packed)
+
+        if layout == 'soa':
+            samples = np.ascontiguousarray(samples.T)
+
+        if out is not None:
+            np.copyto(out, samples)
+            return out
+
         return samples
-    
-    def calculate_logical_error_rate(self, samples, num_syndrome_measurements, decoder_func):
+
+    def simulate_detectors(self, circuit, bit_packed=False):
+        """
+        Sample only detector bits and observable flips from a circuit.
+
+        For threshold studies the raw data-qubit values are not needed,
+        so a detector sampler is strictly less work than simulate_circuit:
+        it emits only the (num_shots, num_detectors) detection events plus
+        the (num_shots, num_observables) observable flips, which for
+        multi-round circuits is far less memory traffic than the full
+        measurement record. Note the flips are raw (undecoded):
+        np.mean(observable_flips) is the uncorrected observable flip
+        rate, and the logical error rate is the mean of (decoder
+        predictions XOR observable_flips) — decoder.decode_with_pymatching
+        runs that full pipeline. Requires the circuit to carry DETECTOR /
+        OBSERVABLE_INCLUDE annotations (as emitted by
+        create_syndrome_measurement_circuit); the compiled detector
+        sampler is cached alongside the measurement samplers.
+
+        Args:
+            circuit (stim.Circuit): Annotated circuit to simulate
+            bit_packed (bool): Return both arrays packed 8 bits per byte
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: (detections,
+            observable_flips), shapes (num_shots, num_detectors) and
+            (num_shots, num_observables)
+        """
+        sampler = self._get_sampler(circuit, kind='d')
+        return sampler.sample(shots=self.num_shots, bit_packed=bit_packed,
+                              separate_observables=True)
+
+    def calculate_logical_error_rate(self, samples, num_syndrome_measurements,
+                                     decoder_func=None, layout='aos'):
         """
         Calculate the logical error rate after error correction.
-        
+
         Args:
             samples (numpy.ndarray): Measurement samples
             num_syndrome_measurements (int): Number of syndrome measurements
-            decoder_func (callable): Function to decode syndrome and data measurements
-            
+            decoder_func (callable, optional): Batched decoder taking
+                (syndromes [N, s], data [N, d]) arrays and returning the
+                [N] corrected logical values; defaults to the compiled
+                majority-vote decoder. Wrap a per-shot decoder with
+                scalar_decoder_adapter for the legacy contract.
+            layout (str): Orientation of samples, matching
+                simulate_circuit: 'aos' (shots are rows) or 'soa'
+                (measurements are rows)
+
         Returns:
             float: Logical error rate (fraction of errors after correction)
         """
-        num_errors = 0
-        
-        for sample in samples:
-            # Split syndrome and data measurements
-            syndrome = sample[:num_syndrome_measurements]
-            data = sample[num_syndrome_measurements:]
-            
-            # Decode to get the corrected logical value
-            corrected_value = decoder_func(syndrome, data)
-            
-            # Expected logical value is 0 (we initialized to |0⟩)
-            if corrected_value != 0:
-                num_errors += 1
-        
-        return num_errors / len(samples)
+        if layout not in ['aos', 'soa']:
+            raise ValueError("Layout must be 'aos' or 'soa'")
+
+        if decoder_func is None:
+            from .decoder import decode_repetition_majority
+            decoder_func = decode_repetition_majority
+
+        samples = np.asarray(samples)
+
+        # Split syndrome and data measurements for the whole batch. For
+        # the SoA layout the slices are row blocks, handed to the decoder
+        # as transposed views to keep its (shots, bits) contract.
+        if layout == 'soa':
+            syndrome = samples[:num_syndrome_measurements].T
+            data = samples[num_syndrome_measurements:].T
+        else:
+            syndrome = samples[:, :num_syndrome_measurements]
+            data = samples[:, num_syndrome_measurements:]
+
+        # Decode all shots in one call
+        corrected = np.asarray(decoder_func(syndrome, data))
+
+        # Expected logical value is 0 (we initialized to |0⟩)
+        return np.count_nonzero(corrected) / corrected.size
     
-    def calculate_physical_error_rate(self, samples):
+    def calculate_physical_error_rate(self, samples, bit_packed=False,
+                                      bits_per_shot=1):
         """
         Calculate the physical error rate (for unprotected qubits).
-        
+
         Args:
             samples (numpy.ndarray): Measurement samples (single qubit)
-            
+            bit_packed (bool): Samples are packed 8 measurements per byte
+                (as returned by simulate_circuit(..., bit_packed=True))
+            bits_per_shot (int): Real measurement bits per shot in the
+                packed layout; padding bits are zero and ignored
+
         Returns:
             float: Physical error rate
         """
-        # Count how many times we measured 1 (error occurred)
-        num_errors = np.sum(samples)
-        return num_errors / len(samples)
+        if bit_packed:
+            if hasattr(np, 'bitwise_count'):
+                errors = int(np.bitwise_count(samples).sum(dtype=np.int64))
+            else:
+                errors = int(np.unpackbits(samples).sum(dtype=np.int64))
+            return errors / (samples.shape[0] * bits_per_shot)
+
+        # Fraction of shots that measured 1 (error occurred); one fused
+        # mean pass with an FP32 accumulator is ample precision here.
+        return float(np.mean(np.ravel(samples), dtype=np.float32))
+
+
+def scalar_decoder_adapter(decoder_func):
+    """
+    Wrap a per-shot decoder into the batched decoder contract.
+
+    Args:
+        decoder_func (callable): Function taking a single shot's
+            (syndrome, data) arrays and returning a logical value
+
+    Returns:
+        callable: Batched decoder mapping (syndromes [N, s], data [N, d])
+        to an [N] array of logical values
+    """
+    def batched(syndromes, data):
+        return np.fromiter(
+            (decoder_func(s, d) for s, d in zip(syndromes, data)),
+            dtype=np.uint8, count=len(data)
+        )
+    return batched
+
+
+# Compiled samplers, memoized by code and noise parameters so repeated
+# sweeps over the same grid never recompile a circuit.
+_sampler_cache = {}
+
+
+def build_sampler(code, noise_prob, measurement_noise=0.0):
+    """
+    Build a circuit and compile a reusable measurement sampler for it.
+
+    Compiling the sampler is the expensive one-time step in Stim, so the
+    result is memoized on (distance, basis, noise_prob, measurement_noise);
+    repeated calls with the same configuration return the same compiled
+    sampler and circuit.
+
+    Args:
+        code: RepetitionCode instance
+        noise_prob (float): Bit-flip error probability
+        measurement_noise (float): Measurement error probability
+
+    Returns:
+        Tuple[stim.CompiledMeasurementSampler, stim.Circuit]: Compiled
+        sampler and the circuit it was built from
+    """
+    # Exact float keys: canonicalize the type (int/numpy scalars) but
+    # never unify nearby values — distinct noise points must not share
+    # a sampler.
+    key = (code.code_distance, code.basis,
+           float(noise_prob), float(measurement_noise))
+
+    cached = _sampler_cache.get(key)
+    if cached is None:
+        circuit = code.create_full_circuit(noise_prob, measurement_noise)
+        # The codes always encode |0⟩, so the noiseless reference sample
+        # is identically zero and can safely be skipped.
+        sampler = circuit.compile_sampler(skip_reference_sample=True)
+        cached = (sampler, circuit)
+        _sampler_cache[key] = cached
+
+    return cached
+
+
+def build_unprotected_sampler(noise_prob, basis='z'):
+    """
+    Compile a reusable sampler for the unprotected baseline circuit.
+
+    Same memoization scheme as build_sampler, keyed on
+    ('unprotected', basis, noise_prob), so baseline sweeps revisiting a
+    noise point reuse the compiled sampler entirely. The noiseless
+    unprotected circuit measures zero in either basis, so the reference
+    sample is skipped like everywhere else.
+
+    Args:
+        noise_prob (float): Error probability
+        basis (str): 'z' or 'x'
+
+    Returns:
+        Tuple[stim.CompiledMeasurementSampler, stim.Circuit]: Compiled
+        sampler and the circuit it was built from
+    """
+    key = ('unprotected', basis, float(noise_prob))
+
+    cached = _sampler_cache.get(key)
+    if cached is None:
+        from .repetition_code import UnprotectedQubit
+        circuit = UnprotectedQubit(basis=basis).create_circuit(noise_prob)
+        sampler = circuit.compile_sampler(skip_reference_sample=True)
+        cached = (sampler, circuit)
+        _sampler_cache[key] = cached
+
+    return cached
+
+
+def clear_sampler_cache():
+    """Drop all memoized samplers (e.g. under memory pressure)."""
+    _sampler_cache.clear()
 
 
 def run_error_correction_simulation(code, noise_prob, measurement_noise=0.0, num_shots=10000):
     """
     Run a complete error correction simulation.
-    
+
     Args:
         code: RepetitionCode instance
         noise_prob (float): Bit-flip error probability
         measurement_noise (float): Measurement error probability
         num_shots (int): Number of simulation runs
-        
+
     Returns:
         Tuple[numpy.ndarray, stim.Circuit]: Samples and circuit used
     """
-    circuit = code.create_full_circuit(noise_prob, measurement_noise)
-    simulator = ErrorSimulator(num_shots)
-    samples = simulator.simulate_circuit(circuit)
-    
+    sampler, circuit = build_sampler(code, noise_prob, measurement_noise)
+    samples = sampler.sample(shots=num_shots)
+
     return samples, circuit
 
 
-def run_unprotected_simulation(noise_prob, num_shots=10000, basis='z'):
+def simulate_and_decode(code, noise_prob, measurement_noise=0.0,
+                        num_shots=10000, expected_value=0, chunk_size=4096):
+    """
+    Sample a code's circuit and return the logical error rate directly.
+
+    Fuses sampling and decoding: shots are drawn bit-packed from Stim
+    (one bit per measurement) and the majority vote is taken by
+    popcounting the masked data bits, so the dense one-byte-per-bit
+    samples matrix is never materialized. Shots are streamed in chunks
+    and reduced to a running error count, keeping peak memory at
+    O(chunk_size) regardless of num_shots. Use
+    run_error_correction_simulation when the raw samples are needed.
+
+    Args:
+        code: RepetitionCode instance
+        noise_prob (float): Bit-flip error probability
+        measurement_noise (float): Measurement error probability
+        num_shots (int): Number of simulation runs
+        expected_value (int): Expected logical value (0 or 1)
+        chunk_size (int): Shots sampled and decoded per batch
+
+    Returns:
+        float: Logical error rate
+    """
+    sampler, _ = build_sampler(code, noise_prob, measurement_noise)
+
+    bit_packed = hasattr(np, 'bitwise_count')
+    if bit_packed:
+        # Byte mask selecting the data-qubit bits out of each packed shot
+        # (Stim packs measurement k into bit k % 8 of byte k // 8).
+        column_is_data = np.zeros(code.get_num_measurements(), dtype=np.uint8)
+        column_is_data[code.num_ancillas:] = 1
+        data_mask = np.packbits(column_is_data, bitorder='little')
+
+    errors = 0
+    remaining = num_shots
+
+    while remaining > 0:
+        shots = min(chunk_size, remaining)
+
+        if bit_packed:
+            from .decoder import _popcount_rows
+            packed = sampler.sample(shots=shots, bit_packed=True)
+            votes = _popcount_rows(packed & data_mask)
+            decoded = (votes * 2 > code.num_qubits).astype(np.uint8)
+        else:
+            # Without a vectorized popcount there is no gain from the
+            # packed layout; decode through the standard path instead.
+            from .decoder import decode_samples
+            samples = sampler.sample(shots=shots)
+            decoded = decode_samples(samples, code.code_distance)
+
+        errors += np.count_nonzero(decoded != expected_value)
+        remaining -= shots
+
+    return errors / num_shots
+
+
+def error_rate_at(code, noise_prob, num_shots, decoder_func=None,
+                  chunk=4096, measurement_noise=0.0):
+    """
+    Fused build + sample + decode + reduce pipeline for one noise point.
+
+    Single entry point for "what is the logical error rate here":
+    the sampler is built once (through the module caches), shots are
+    streamed in chunks, each chunk is decoded and folded into a running
+    error count, and the samples are discarded — no full samples matrix
+    is ever materialized, so the working set is one chunk. The default
+    chunk keeps chunk * num_measurements within L2 for the codes here.
+
+    Args:
+        code: RepetitionCode instance
+        noise_prob (float): Bit-flip error probability
+        num_shots (int): Number of simulation runs
+        decoder_func (callable, optional): Batched decoder taking
+            (syndromes [N, s], data [N, d]) arrays and returning the [N]
+            corrected logical values; defaults to the majority-vote
+            decoder, which additionally streams bit-packed
+        chunk (int): Shots sampled and decoded per batch
+        measurement_noise (float): Measurement error probability
+
+    Returns:
+        float: Logical error rate
+    """
+    if decoder_func is None:
+        # The majority-vote default has its own fully fused path that
+        # also keeps the shots bit-packed through the decode.
+        return simulate_and_decode(code, noise_prob, measurement_noise,
+                                   num_shots, chunk_size=chunk)
+
+    sampler, _ = build_sampler(code, noise_prob, measurement_noise)
+
+    errors = 0
+    remaining = num_shots
+    while remaining > 0:
+        shots = min(chunk, remaining)
+        samples = sampler.sample(shots=shots)
+        corrected = np.asarray(decoder_func(samples[:, :code.num_ancillas],
+                                            samples[:, code.num_ancillas:]))
+        errors += np.count_nonzero(corrected)
+        remaining -= shots
+
+    return errors / num_shots
+
+
+def run_unprotected_simulation(noise_prob, num_shots=10000, basis='z',
+                               use_stim=False, rng=None):
     """
     Run simulation for an unprotected qubit.
-    
+
+    An unprotected qubit under either noise basis is just a Bernoulli
+    coin flip with probability noise_prob, so by default the samples are
+    drawn directly with NumPy instead of going through a Stim circuit.
+    Pass use_stim=True to run the full circuit simulation (e.g. for
+    validating the shortcut).
+
     Args:
         noise_prob (float): Error probability
         num_shots (int): Number of simulation runs
         basis (str): 'z' or 'x'
-        
+        use_stim (bool): Simulate the actual circuit instead of drawing
+            the Bernoulli distribution directly
+        rng (numpy.random.Generator, optional): Generator for the direct
+            Bernoulli draw; a fresh default_rng() is used if omitted
+
     Returns:
         Tuple[numpy.ndarray, stim.Circuit]: Samples and circuit used
+        (circuit is None for the direct Bernoulli path)
     """
-    from .repetition_code import UnprotectedQubit
-    
-    unprotected = UnprotectedQubit(basis=basis)
-    circuit = unprotected.create_circuit(noise_prob)
-    simulator = ErrorSimulator(num_shots)
-    samples = simulator.simulate_circuit(circuit)
-    
+    if not use_stim:
+        if rng is None:
+            rng = np.random.default_rng()
+        samples = (rng.random((num_shots, 1)) < noise_prob).astype(np.uint8)
+        return samples, None
+
+    sampler, circuit = build_unprotected_sampler(noise_prob, basis)
+    samples = sampler.sample(shots=num_shots)
+
     return samples, circuit
 
 
-def sweep_noise_probabilities(code, noise_probs, measurement_noise=0.0, num_shots=10000):
+def sweep_noise_probabilities(code, noise_probs, measurement_noise=0.0,
+                              num_shots=10000, decoder_func=None,
+                              return_samples=False):
     """
     Sweep over different noise probabilities and collect error rates.
-    
+
+    By default each noise point is decoded as soon as it is sampled and
+    reduced to a scalar logical error rate, so peak memory stays at one
+    point's samples instead of the whole sweep's. Pass
+    return_samples=True for the old behavior of keeping every point's
+    raw samples array alive.
+
     Args:
         code: RepetitionCode instance
         noise_probs (list): List of noise probabilities to test
         measurement_noise (float): Measurement error probability
         num_shots (int): Number of shots per simulation
-        
+        decoder_func (callable, optional): Batched decoder taking
+            (syndromes [N, s], data [N, d]) arrays and returning the [N]
+            corrected logical values; defaults to the majority-vote
+            decoder. Ignored when return_samples=True.
+        return_samples (bool): Return raw samples per point instead of
+            decoded error rates
+
     Returns:
-        List[Tuple[float, numpy.ndarray]]: List of (noise_prob, samples) pairs
+        List[Tuple[float, float]]: List of (noise_prob, logical_error_rate)
+        pairs, or (noise_prob, samples) pairs when return_samples=True
     """
-    results = []
-    
-    for noise_prob in noise_probs:
+    # Each noise point is independent and Stim releases the GIL while
+    # sampling, so a thread pool keeps all cores busy; map preserves the
+    # input ordering.
+    def _sample_point(noise_prob):
         samples, _ = run_error_correction_simulation(
             code, noise_prob, measurement_noise, num_shots
         )
-        results.append((noise_prob, samples))
-    
-    return results
+        return samples
+
+    def _rate_point(noise_prob):
+        if decoder_func is None:
+            # Fused streaming path: never materializes the full samples
+            return simulate_and_decode(code, noise_prob, measurement_noise,
+                                       num_shots)
+        samples = _sample_point(noise_prob)
+        syndrome = samples[:, :code.num_ancillas]
+        data = samples[:, code.num_ancillas:]
+        corrected = np.asarray(decoder_func(syndrome, data))
+        return np.count_nonzero(corrected) / corrected.size
+
+    point = _sample_point if return_samples else _rate_point
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(point, noise_probs))
+
+    return list(zip(noise_probs, results))
 
 
 def compare_code_sizes(code_distances, noise_prob, measurement_noise=0.0, num_shots=10000):
@@ -161,14 +540,17 @@ def compare_code_sizes(code_distances, noise_prob, measurement_noise=0.0, num_sh
         dict: Dictionary mapping code_distance to samples
     """
     from .repetition_code import RepetitionCode
-    
-    results = {}
-    
-    for distance in code_distances:
+
+    # Same pattern as sweep_noise_probabilities: each distance is an
+    # independent simulation and Stim samples without holding the GIL.
+    def _sample_distance(distance):
         code = RepetitionCode(distance)
         samples, _ = run_error_correction_simulation(
             code, noise_prob, measurement_noise, num_shots
         )
-        results[distance] = samples
-    
-    return results
+        return samples
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        samples_list = list(executor.map(_sample_distance, code_distances))
+
+    return dict(zip(code_distances, samples_list))
@@ -6,6 +6,8 @@ Repetition codes encode a logical qubit into multiple physical qubits
 to protect against bit-flip errors.
 """
 
+import functools
+
 import stim
 import numpy as np
 
@@ -17,6 +19,10 @@ class RepetitionCode:
     The repetition code encodes one logical qubit into n physical qubits,
     where n is odd (typically 3, 5, or 7). It can correct up to (n-1)/2
     bit-flip errors.
+
+    The simulation circuits always encode logical |0⟩, so the noiseless
+    measurement record is identically zero; samplers may therefore skip
+    the reference sample and treat flip bits as measurement bits.
     """
     
     def __init__(self, code_distance, basis='z'):
@@ -38,122 +44,155 @@ class RepetitionCode:
         self.num_ancillas = code_distance - 1  # For syndrome measurement
         self.basis = basis
     
+    def _append_encoding(self, circuit, rotate_to_basis=True):
+        """
+        Append the encoding layer to an existing circuit.
+
+        Spreads the state of qubit 0 across all data qubits with a CNOT
+        ladder; Stim reads the flat target list as consecutive
+        (control, target) pairs, so the whole ladder is one append. For
+        the Phase-Flip code (X basis) the qubits are then rotated so
+        logical |0> (|00...0>) becomes |+>_L (|++...+>); callers that
+        cancel the rotation against a later H layer pass
+        rotate_to_basis=False to skip it.
+        """
+        circuit.append("CNOT", [t for i in range(1, self.num_qubits)
+                                for t in (0, i)])
+        if rotate_to_basis and self.basis == 'x':
+            circuit.append("H", list(range(self.num_qubits)))
+
     def create_encoding_circuit(self, initial_state='0'):
         """
         Create a circuit that encodes a logical qubit into the repetition code.
-        
+
         Args:
             initial_state (str): Initial logical state ('0' or '1')
-            
+
         Returns:
             stim.Circuit: The encoding circuit
         """
         circuit = stim.Circuit()
-        
+
         # Initialize the first qubit to the desired state
         if initial_state == '1':
             circuit.append("X", [0])
-        
-        # Encode by applying CNOT gates to spread the state
-        for i in range(1, self.num_qubits):
-            circuit.append("CNOT", [0, i])
-            
-        # If using Phase-Flip code (X basis), apply H to all qubits
-        # This transforms the logical |0> (|00...0>) into |+>_L (|++...+>)
-        if self.basis == 'x':
-            for i in range(self.num_qubits):
-                circuit.append("H", [i])
-        
+
+        self._append_encoding(circuit)
+
         return circuit
     
+    def _syndrome_extraction_block(self, measurement_noise=0.0):
+        """
+        Build one full round of syndrome extraction as a sub-circuit.
+
+        The round resets all ancillas, extracts the pairwise parities,
+        and measures the ancillas; ancilla i checks the parity of data
+        qubits i and i+1. Keeping the round as a standalone block lets a
+        multi-round memory experiment repeat it (block * rounds) and the
+        single-round builders compose it with `+=`.
+
+        Args:
+            measurement_noise (float): Probability of measurement error
+
+        Returns:
+            stim.Circuit: The syndrome extraction round
+        """
+        block = stim.Circuit()
+        ancilla_offset = self.num_qubits
+        ancillas = [ancilla_offset + i for i in range(self.num_ancillas)]
+
+        # Reset all ancillas (assumed to start from |0>)
+        block.append("R", ancillas)
+
+        # Each ancilla is targeted by exactly two CNOTs, which commute
+        # across ancillas, so the whole layer is two batched appends.
+        block.append("CNOT", [t for i in range(self.num_ancillas)
+                              for t in (i, ancilla_offset + i)])
+        block.append("CNOT", [t for i in range(self.num_ancillas)
+                              for t in (i + 1, ancilla_offset + i)])
+
+        # Measure all ancillas (in index order, preserving record layout)
+        if measurement_noise > 0:
+            block.append("X_ERROR", ancillas, measurement_noise)
+        block.append("M", ancillas)
+
+        return block
+
     def create_syndrome_measurement_circuit(self, noise_prob=0.0, measurement_noise=0.0):
         """
         Create a circuit for syndrome measurement.
-        
+
+        Construction is memoized on (distance, basis, noise_prob,
+        measurement_noise); repeated calls with the same parameters return
+        the same stim.Circuit object, which is immutable for our purposes
+        and safe to share (this also lets sampler caches keyed on circuit
+        identity hit).
+
         Args:
             noise_prob (float): Probability of error (X for basis='z', Z for basis='x')
             measurement_noise (float): Probability of measurement error
-            
+
         Returns:
             stim.Circuit: Complete circuit with encoding, noise, and syndrome measurement
         """
+        # Canonicalize to plain floats so e.g. 0, 0.0 and numpy scalars
+        # land on one cache entry and every caller of the noiseless
+        # configuration shares the same circuit object (which in turn
+        # lets id(circuit)-keyed sampler caches hit).
+        return _build_syndrome_circuit(self.code_distance, self.basis,
+                                       float(noise_prob),
+                                       float(measurement_noise))
+
+    def _build_syndrome_measurement_circuit(self, noise_prob, measurement_noise):
+        """Uncached construction behind create_syndrome_measurement_circuit."""
         circuit = stim.Circuit()
-        
-        # 1. Encoding
-        # Standard |0> encoding
-        for i in range(1, self.num_qubits):
-            circuit.append("CNOT", [0, i])
-            
-        # If X-basis code, rotate to X-basis
-        if self.basis == 'x':
-            for i in range(self.num_qubits):
-                circuit.append("H", [i])
-        
-        # 2. Noise
-        # Add noise relevant to the code
-        noise_op = "X_ERROR" if self.basis == 'z' else "Z_ERROR"
+
+        # For the X-basis code the simulated circuit used to rotate to the
+        # X basis right before the noise channel and back right before
+        # syndrome extraction. Those two H layers sandwich only the noise,
+        # and H·Z_ERROR·H = X_ERROR, so both layers cancel once the noise
+        # op is conjugated: the simulated circuit is identical for either
+        # basis. The physical interpretation is unchanged — for basis='x'
+        # the Z-basis records below represent X-basis results, with
+        # |+> mapped to 0 and |-> mapped to 1.
+
+        # 1. Encoding (standard |0> encoding, shared with
+        # create_encoding_circuit but without the cancelled rotation)
+        self._append_encoding(circuit, rotate_to_basis=False)
+
+        # 2. Noise (Z_ERROR conjugated through the cancelled H layers
+        # becomes X_ERROR, so both bases inject X_ERROR here)
         if noise_prob > 0:
-            for i in range(self.num_qubits):
-                circuit.append(noise_op, [i], noise_prob)
-        
+            circuit.append("X_ERROR", list(range(self.num_qubits)), noise_prob)
+
         # 3. Syndrome Measurement
-        # We assume ancillas are 0.
-        ancilla_offset = self.num_qubits
-        
-        # If X-basis code, we need to measure X-parity (ZZ..Z in X-basis is XX..X in Z-basis)
-        # To measure X-parity using CNOTs (which measure Z-parity), we need to rotate data to Z-basis temporarily
-        if self.basis == 'x':
-             for i in range(self.num_qubits):
-                circuit.append("H", [i])
-        
-        for i in range(self.num_ancillas):
-            # Reset ancilla
-            circuit.append("R", [ancilla_offset + i])
-            
-            # Measure parity between qubits i and i+1
-            # For Z-basis code: Checks Z_i Z_{i+1} parity
-            # For X-basis code (after H): Checks X_i X_{i+1} parity
-            circuit.append("CNOT", [i, ancilla_offset + i])
-            circuit.append("CNOT", [i + 1, ancilla_offset + i])
-            
-            # Measure ancilla
-            if measurement_noise > 0:
-                circuit.append("X_ERROR", [ancilla_offset + i], measurement_noise)
-            circuit.append("M", [ancilla_offset + i])
-            
-        # If X-basis code, rotate back to X-basis if we were continuing
-        # But since we are just measuring immediately after, we can choose to measure in X basis
-        # However, for consistency with 'decoding', let's stick to the convention:
-        # Measure data qubits in the correct basis.
-        
-        # If we didn't rotate back for X-basis code, we are currently in Z-basis.
-        # Measuring in Z-basis is effectively Measuring in X-basis of the original state.
-        # So for X-basis code:
-        #   - We rotated Data H->Z basis.
-        #   - We measured Z-parity (which is X-parity of original).
-        #   - Now we want to measure Data in X-basis. 
-        #   - Since Data is currently in Z-basis (due to H), measuring in Z (M) IS measuring in X of original.
-        # So we don't need to do anything for X-basis if we want to measure final logical state.
-        
-        # However, strictly for the circuit to be "state restoration" we should H back.
-        # But here we just want to measure.
-        
-        # Let's handle the measurement explicitly to be clear.
-        if self.basis == 'x':
-             # We are currently in Z-basis (rotated). To measure X-basis of the *code*, we just measure Z.
-             # Wait, logic check:
-             # State |+++>. H -> |000>. Noise Z -> X. Parity check (CNOT) checks Z-parity (X-parity of original).
-             # Final measure: We want to see if it's + or -.
-             # |+> -> H -> |0>. Measure 0.
-             # So yes, simpler to just leave it in Z-basis and Measure Z.
-             pass
-        
+        circuit += self._syndrome_extraction_block(measurement_noise)
+
+        # Declare each ancilla measurement as a detector. The noiseless
+        # record is identically zero, so for this single round every
+        # ancilla is compared directly against the zero reference. (The
+        # extraction block itself stays annotation-free so a multi-round
+        # experiment can add its own round-over-round parities.)
+        n = self.num_qubits
+        for j in range(self.num_ancillas):
+            circuit.append("DETECTOR",
+                           [stim.target_rec(-(self.num_ancillas - j))])
+
         # Final measurement of all data qubits
-        # For 'z' basis: Measure in Z.
-        # For 'x' basis: We rotated to Z basis for syndrome, so Measure in Z.
-        for i in range(self.num_qubits):
-            circuit.append("M", [i])
-        
+        circuit.append("M", list(range(n)))
+
+        # Each adjacent data pair must agree with the syndrome bit that
+        # compared them; record indices count back over the n data
+        # measurements and then the n-1 ancilla measurements.
+        for j in range(self.num_ancillas):
+            circuit.append("DETECTOR",
+                           [stim.target_rec(-(n - j)),
+                            stim.target_rec(-(n - j - 1)),
+                            stim.target_rec(-(2 * n - 1 - j))])
+
+        # The logical observable is any single data qubit's value.
+        circuit.append("OBSERVABLE_INCLUDE", [stim.target_rec(-1)], 0)
+
         return circuit
     
     def create_full_circuit(self, noise_prob=0.0, measurement_noise=0.0):
@@ -197,31 +236,43 @@ class UnprotectedQubit:
     def create_circuit(self, noise_prob=0.0):
         """
         Create a simple circuit with a single qubit and noise.
-        
+
+        The circuit's structure is fixed per basis with only noise_prob
+        varying, so it is built by interpolating the probability into a
+        template string — one C++-side parse instead of several Python
+        appends — and memoized on (basis, noise_prob) like the syndrome
+        circuits, so repeated baseline sweeps share one circuit object.
+
         Args:
             noise_prob (float): Probability of error
-            
+
         Returns:
             stim.Circuit: Simple circuit with one qubit
         """
-        circuit = stim.Circuit()
-        
-        # Single qubit initialized to |0⟩
-        if self.basis == 'x':
-            circuit.append("H", [0])
-            
-        # Add noise
-        noise_op = "X_ERROR" if self.basis == 'z' else "Z_ERROR"
-        if noise_prob > 0:
-            circuit.append(noise_op, [0], noise_prob)
-        
-        # Measure the qubit
-        if self.basis == 'x':
-            circuit.append("H", [0])
-            
-        circuit.append("M", [0])
-        
-        return circuit
+        return _build_unprotected_circuit(self.basis, float(noise_prob))
+
+
+@functools.lru_cache(maxsize=256)
+def _build_syndrome_circuit(code_distance, basis, noise_prob, measurement_noise):
+    """Memoized builder backing create_syndrome_measurement_circuit."""
+    code = RepetitionCode(code_distance, basis)
+    return code._build_syndrome_measurement_circuit(noise_prob, measurement_noise)
+
+
+@functools.lru_cache(maxsize=256)
+def _build_unprotected_circuit(basis, noise_prob):
+    """Memoized template builder backing UnprotectedQubit.create_circuit."""
+    if basis == 'x':
+        noise = f"Z_ERROR({noise_prob}) 0\n" if noise_prob > 0 else ""
+        return stim.Circuit(f"H 0\n{noise}H 0\nM 0")
+    noise = f"X_ERROR({noise_prob}) 0\n" if noise_prob > 0 else ""
+    return stim.Circuit(f"{noise}M 0")
+
+
+def clear_circuit_cache():
+    """Drop all memoized circuits (e.g. under memory pressure)."""
+    _build_syndrome_circuit.cache_clear()
+    _build_unprotected_circuit.cache_clear()
 
 
 def create_repetition_code(code_distance, basis='z'):